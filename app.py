@@ -1,31 +1,190 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-from typing import Literal
-import pandas as pd
-import pickle
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import Annotated, Any, Literal
+import msgspec
+import numpy as np
+import onnxruntime as ort
+import asyncio
+import gc
+import os
+import re
 from fastapi.responses import JSONResponse
 
-app = FastAPI(title="Insurance Premium Category Predictor")
 
+tier_1_cities = frozenset({"Kathmandu","Pokhara","lalitpur","Bharatpur"})
+tier_2_cities = frozenset({
+    "Butwal","Tulsipur","Janakpur","Biratnagar","Dharan","Hetauda","Bhairahawa","Dhangadhi","Itahari","Gorkha","Nepalgunj"})
+city_tiers = {city: 1 for city in tier_1_cities} | {city: 2 for city in tier_2_cities}
+
+
+_json_encoder = msgspec.json.Encoder()
+
+
+class MsgspecJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return _json_encoder.encode(content)
 
-tier_1_cities = ["Kathmandu","Pokhara","lalitpur","Bharatpur"]
-tier_2_cities = [
-    "Butwal","Tulsipur","Janakpur","Biratnagar","Dharan","Hetauda","Bhairahawa","Dhangadhi","Itahari","Gorkha","Nepalgunj"]
 
 # ---- Load model ----
+# model.onnx is exported from model.pkl by export_onnx.py
+# ORT_INTRA_OP_THREADS caps onnxruntime's per-process thread pool (0 = one per
+# core); with several server workers set it so workers * threads <= cores.
+_session_options = ort.SessionOptions()
+_session_options.intra_op_num_threads = int(os.environ.get("ORT_INTRA_OP_THREADS", "0"))
 try:
-    with open("model.pkl", "rb") as f:
-        model = pickle.load(f)
+    model = ort.InferenceSession(
+        "model.onnx", _session_options, providers=["CPUExecutionProvider"]
+    )
 except Exception as e:
-    raise RuntimeError(f"Failed to load model.pkl: {e}")
+    raise RuntimeError(f"Failed to load model.onnx: {e}")
+
+# Everything is loaded at import time so a preloading server (gunicorn --preload)
+# does it once in the master. The session's weights live in native memory the GC
+# never scans; freezing keeps the cyclic GC from writing to the import-time
+# Python objects (modules, app, lookup tables) and so un-sharing their pages.
+gc.freeze()
+
+# ---- Preallocated input batch ----
+# The ONNX graph takes one (n, 1) tensor per feature; allocate them once and
+# overwrite the leading rows in place for every batch.
+_FEATURE_DTYPES = {
+    "bmi": np.float32,
+    "age_group": object,
+    "lifestyle_risk": object,
+    "city_tier": np.int64,
+    "income": np.float32,
+    "occupation": object,
+}
+_MAX_BATCH = 64
+_BATCH_WINDOW = 0.005  # seconds to wait for more requests to join a batch
+_BUF = {name: np.empty((_MAX_BATCH, 1), dtype=dtype) for name, dtype in _FEATURE_DTYPES.items()}
+
+# Inputs the label features are looked up from, a batch at a time. bmi is kept
+# in float64 so the bucket comparisons see the exact rounded value.
+_AGE = np.empty(_MAX_BATCH, dtype=np.int64)
+_BMI = np.empty(_MAX_BATCH)
+_SMOKER = np.empty(_MAX_BATCH, dtype=np.intp)
+
+# Where each field of a request row is written, in row order
+_ROW_COLUMNS = [
+    _AGE,
+    _BMI,
+    _SMOKER,
+    _BUF["city_tier"][:, 0],
+    _BUF["income"][:, 0],
+    _BUF["occupation"][:, 0],
+]
+
+# MUST match training casing: Low/Medium/High
+# indexed by [smoker, bmi bucket]: bmi <= 27, 27 < bmi <= 30, bmi > 30
+_LIFESTYLE_RISK = np.array([["Low", "Medium", "Medium"], ["Medium", "Medium", "High"]], dtype=object)
+_BMI_BOUNDS = np.array([27, 30])
+
+# age < 25: young, < 45: adult, < 60: middle_aged, else senior
+_AGE_BOUNDS = np.array([25, 45, 60])
+_AGE_LABELS = np.array(["young", "adult", "middle_aged", "senior"], dtype=object)
+
+
+def bmi(weight: float, height: float) -> float:
+    # Python's round() rounds the exact decimal value; np.round does not and
+    # disagrees on halfway cases (e.g. 63.7 / 2.0 ** 2), which changes predictions.
+    return round(weight / (height ** 2), 2)
+
+
+def _lookup_labels(n: int):
+    _BUF["bmi"][:n, 0] = _BMI[:n]
+    _BUF["age_group"][:n, 0] = _AGE_LABELS[np.searchsorted(_AGE_BOUNDS, _AGE[:n], side="right")]
+    _BUF["lifestyle_risk"][:n, 0] = _LIFESTYLE_RISK[_SMOKER[:n], np.searchsorted(_BMI_BOUNDS, _BMI[:n])]
+
+
+def _run_model(n: int):
+    _lookup_labels(n)
+    return model.run(["label"], {name: col[:n] for name, col in _BUF.items()})[0]
+
+
+async def _batch_worker(queue: asyncio.Queue):
+    # Only this task touches _BUF, and it waits for each predict to finish
+    # before filling the next batch, so no lock is needed.
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + _BATCH_WINDOW
+        while len(batch) < _MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        n = len(batch)
+        try:
+            for i, (row, _) in enumerate(batch):
+                for col, value in zip(_ROW_COLUMNS, row):
+                    col[i] = value
+            preds = await run_in_threadpool(_run_model, n)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            continue
+
+        for (_, fut), pred in zip(batch, preds):
+            if not fut.done():
+                fut.set_result(pred)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.predict_queue = asyncio.Queue()
+    worker = asyncio.create_task(_batch_worker(app.state.predict_queue))
+    try:
+        yield
+    finally:
+        worker.cancel()
+
+
+app = FastAPI(
+    title="Insurance Premium Category Predictor",
+    lifespan=lifespan,
+    default_response_class=MsgspecJSONResponse,
+)
+
+
+def city_tier(city: str) -> int:
+    return city_tiers.get(city, 3)
 
 
-class UserInput(BaseModel):
-    age: int = Field(gt=0, lt=120)
-    weight: float = Field(gt=0)
-    height: float = Field(gt=0)   # meters
-    income: float = Field(gt=0)
-    smoker: bool
+# Same spellings Pydantic accepted for bool fields, so existing clients keep working
+_BOOL_STRINGS = {
+    "1": True, "on": True, "t": True, "true": True, "y": True, "yes": True,
+    "0": False, "off": False, "f": False, "false": False, "n": False, "no": False,
+}
+_JSON_TYPE_NAMES = {str: "str", int: "int", float: "float", list: "array", dict: "object", type(None): "null"}
+
+
+def _parse_bool(value: Any, field: str) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        try:
+            return _BOOL_STRINGS[value.lower()]
+        except KeyError:
+            raise ValueError(f"Invalid boolean {value!r} - at `$.{field}`") from None
+    raise ValueError(f"Expected `bool`, got `{_JSON_TYPE_NAMES.get(type(value), type(value).__name__)}` - at `$.{field}`")
+
+
+class UserInput(msgspec.Struct):
+    age: Annotated[int, msgspec.Meta(gt=0, lt=120)]
+    weight: Annotated[float, msgspec.Meta(gt=0)]
+    height: Annotated[float, msgspec.Meta(gt=0)]   # meters
+    income: Annotated[float, msgspec.Meta(gt=0)]
+    # decoded as-is and normalised in __post_init__; documented as a boolean
+    smoker: Annotated[Any, msgspec.Meta(extra_json_schema={"type": "boolean"})]
     city: str
     occupation: Literal[
         "Student",
@@ -39,39 +198,38 @@ class UserInput(BaseModel):
         "Sales Executive",
     ]
 
-    @property
-    def bmi(self) -> float:
-        return round(self.weight / (self.height ** 2), 2)
-
-    @property
-    def lifestyle_risk(self) -> str:
-        # MUST match training casing: Low/Medium/High
-        if self.smoker and self.bmi > 30:
-            return "High"
-        elif self.smoker or self.bmi > 27:
-            return "Medium"
-        else:
-            return "Low"
-
-    @property
-    def age_group(self) -> str:
-        if self.age < 25:
-            return "young"
-        elif self.age < 45:
-            return "adult"
-        elif self.age < 60:
-            return "middle_aged"
-        else:
-            return "senior"
-
-    @property
-    def city_tier(self) -> int:
-        if self.city in tier_1_cities:
-            return 1
-        elif self.city in tier_2_cities:
-            return 2
-        else:
-            return 3
+    def __post_init__(self):
+        self.smoker = _parse_bool(self.smoker, "smoker")
+
+
+_input_decoder = msgspec.json.Decoder(UserInput, strict=False)
+
+# /predict reads the raw body, so FastAPI can't infer its schema for /docs.
+# UserInput has no nested structs, so its definition can be inlined.
+_user_input_schema = msgspec.json.schema(UserInput)["$defs"]["UserInput"]
+
+
+_ERROR_PATH = re.compile(r" - at `\$(.*)`$")
+_MISSING_FIELD = re.compile(r"^Object missing required field `(.+)`")
+
+
+def _validation_detail(e: msgspec.DecodeError) -> list[dict]:
+    # Same shape as FastAPI's 422 detail: [{"loc": [...], "msg": ..., "type": ...}]
+    msg = str(e)
+    if not isinstance(e, msgspec.ValidationError):
+        return [{"loc": ["body"], "msg": msg, "type": "json_invalid"}]
+
+    loc = ["body"]
+    match = _ERROR_PATH.search(msg)
+    if match:
+        msg = msg[:match.start()]
+        # UserInput is flat, so the path is "" (the body) or ".<field>"
+        loc += [p for p in match.group(1).split(".") if p]
+
+    match = _MISSING_FIELD.match(msg)
+    if match:
+        return [{"loc": loc + [match.group(1)], "msg": msg, "type": "missing"}]
+    return [{"loc": loc, "msg": msg, "type": "value_error"}]
 
 
 @app.get("/")
@@ -79,20 +237,37 @@ def home():
     return {"message": "API is running"}
 
 
-@app.post("/predict")
-def predict(data: UserInput):
-    input_df = pd.DataFrame([{
-        "bmi": data.bmi,
-        "age_group": data.age_group,
-        "lifestyle_risk": data.lifestyle_risk,
-        "city_tier": data.city_tier,
-        "income": data.income,
-        "occupation": data.occupation,
-    }])
+@app.post(
+    "/predict",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _user_input_schema}},
+        },
+    },
+)
+async def predict(request: Request):
+    try:
+        data = _input_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=_validation_detail(e))
+
+    # age_group and lifestyle_risk are looked up for the whole batch at once
+    row = (
+        data.age,
+        bmi(data.weight, data.height),
+        data.smoker,
+        city_tier(data.city),
+        data.income,
+        data.occupation,
+    )
 
+    fut = asyncio.get_running_loop().create_future()
+    await app.state.predict_queue.put((row, fut))
     try:
-        pred = model.predict(input_df)[0]
+        pred = await fut
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    return JSONResponse(content={"predicted_category": pred})
+    # returning the response directly skips FastAPI's jsonable_encoder pass
+    return MsgspecJSONResponse({"predicted_category": pred})
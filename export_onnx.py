@@ -0,0 +1,38 @@
+"""Export model.pkl to model.onnx for serving with onnxruntime.
+
+Run offline whenever model.pkl changes:
+
+    python export_onnx.py
+"""
+import pickle
+
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType, Int64TensorType, StringTensorType
+
+# Must match the feature order/types filled in by app.py
+INITIAL_TYPES = [
+    ("bmi", FloatTensorType([None, 1])),
+    ("age_group", StringTensorType([None, 1])),
+    ("lifestyle_risk", StringTensorType([None, 1])),
+    ("city_tier", Int64TensorType([None, 1])),
+    ("income", FloatTensorType([None, 1])),
+    ("occupation", StringTensorType([None, 1])),
+]
+
+
+def main():
+    with open("model.pkl", "rb") as f:
+        model = pickle.load(f)
+
+    classifier = model.steps[-1][1]
+    onx = convert_sklearn(
+        model,
+        initial_types=INITIAL_TYPES,
+        options={id(classifier): {"zipmap": False}},
+    )
+    with open("model.onnx", "wb") as f:
+        f.write(onx.SerializeToString())
+
+
+if __name__ == "__main__":
+    main()
@@ -32,7 +32,7 @@ if st.button("Predict Premium Category"):
         "weight": weight,
         "height": height,
         "income": income,
-        "smoker": smoker,
+        "smoker": smoker == "Yes",
         "city": city,
         "occupation": occupation
     }
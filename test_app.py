@@ -0,0 +1,82 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app.app) as c:
+        yield c
+
+
+def payload(**overrides):
+    body = {
+        "age": 50,
+        "weight": 63.7,
+        "height": 2.0,
+        "income": 42.4,
+        "smoker": True,
+        "city": "Other",
+        "occupation": "Part-time Worker",
+    }
+    body.update(overrides)
+    return body
+
+
+@pytest.mark.parametrize(
+    "weight, height, expected",
+    [(63.7, 2.0, 15.93), (95.1, 2.0, 23.77), (70.6, 1.61, 27.24), (55.2, 1.54, 23.28)],
+)
+def test_bmi_matches_python_round(weight, height, expected):
+    assert app.bmi(weight, height) == expected == round(weight / height ** 2, 2)
+
+
+def test_halfway_bmi_prediction(client):
+    r = client.post("/predict", json=payload())
+    assert r.json() == {"predicted_category": "Low"}
+
+
+@pytest.mark.parametrize("smoker", ["Yes", "no", "ON", "1", 0, True, 1.0, 0.0])
+def test_smoker_accepts_bool_spellings(client, smoker):
+    assert client.post("/predict", json=payload(smoker=smoker)).status_code == 200
+
+
+@pytest.mark.parametrize("smoker", ["maybe", 2, 0.5, None, []])
+def test_smoker_rejects_non_bool(client, smoker):
+    r = client.post("/predict", json=payload(smoker=smoker))
+    assert r.status_code == 422
+    [error] = r.json()["detail"]
+    assert error["loc"] == ["body", "smoker"]
+    assert "|" not in error["msg"]
+
+
+def test_predict_request_body_in_openapi(client):
+    body = client.get("/openapi.json").json()["paths"]["/predict"]["post"]["requestBody"]
+    schema = body["content"]["application/json"]["schema"]
+    assert body["required"] is True
+    assert set(schema["required"]) == set(payload())
+
+
+@pytest.mark.parametrize(
+    "body, loc, type_",
+    [
+        (payload(age="x"), ["body", "age"], "value_error"),
+        (payload(age=0), ["body", "age"], "value_error"),
+        ({k: v for k, v in payload().items() if k != "city"}, ["body", "city"], "missing"),
+        ([], ["body"], "value_error"),
+    ],
+)
+def test_validation_error_shape(client, body, loc, type_):
+    r = client.post("/predict", json=body)
+    assert r.status_code == 422
+    [error] = r.json()["detail"]
+    assert error["loc"] == loc
+    assert error["type"] == type_
+    assert "`$" not in error["msg"]
+
+
+def test_malformed_json(client):
+    r = client.post("/predict", content=b"{bad", headers={"content-type": "application/json"})
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["type"] == "json_invalid"